@@ -11,7 +11,6 @@ Competition: Microsoft Imagine Cup / Azure Challenge
 """
 
 import streamlit as st
-from PIL import Image
 
 # Core modules
 from core.model import load_model
@@ -29,7 +28,7 @@ from ui.components import (
 )
 
 # Utility modules
-from utils.file_utils import save_temp_file, cleanup_temp_file, load_image
+from utils.file_utils import load_image_from_upload, image_to_array
 
 
 # ============================================================================
@@ -79,25 +78,28 @@ def main():
     # ========================================================================
     
     if uploaded_file is not None:
-        # Save uploaded file to temporary location
-        image_path = save_temp_file(uploaded_file)
-        
+        # Decode straight from the upload buffer; no temp-file round trip.
+        # Normalize to RGB: palette/grayscale uploads decode to 2-D arrays
+        # and RGBA to 4 channels, neither of which the detector accepts.
+        original_img = load_image_from_upload(uploaded_file).convert('RGB')
+
         # Display original and detection results
         st.markdown("---")
         st.markdown("### 🔍 Analysis Results")
-        
+
         col_orig, col_detect = st.columns(2)
-        
+
         with col_orig:
             st.markdown("#### Original Image")
-            original_img = load_image(image_path)
             st.image(original_img, use_column_width=True)
-        
-        # Run detection
+
+        # Run detection on the already-decoded image (no second decode inside Ultralytics)
+        image_array = image_to_array(original_img)
+
         with st.spinner('🔄 Analyzing infrastructure...'):
             results, result_img, num_detections = run_detection(
-                model, 
-                image_path, 
+                model,
+                image_array,
                 confidence_threshold
             )
         
@@ -109,11 +111,9 @@ def main():
         st.session_state.total_scans += 1
         st.session_state.total_defects += num_detections
         
-        # Create and store detection record
+        # Create and store detection record (deque maxlen handles truncation)
         detection_record = create_detection_record(num_detections, confidence_threshold)
-        st.session_state.detection_history.insert(0, detection_record)
-        if len(st.session_state.detection_history) > 10:
-            st.session_state.detection_history.pop()
+        st.session_state.detection_history.appendleft(detection_record)
         
         # Render alert notification
         st.markdown("---")
@@ -131,24 +131,36 @@ def main():
             render_detection_table(detection_data)
             
             # Prepare analytics data
-            confidences = [d['Confidence_Raw'] for d in detection_data]
-            class_names = [d['Type'] for d in detection_data]
+            confidences = detection_data['Confidence'].tolist()
+            class_names = detection_data['Type'].tolist()
             
             # Interactive Analytics
             st.markdown("---")
             st.markdown("### 📊 Detection Analytics")
             
+            # Reuse this session's figures when the detection data is
+            # unchanged between reruns (e.g. an unrelated widget event)
+            fig_key = hash((tuple(confidences), tuple(class_names)))
+            fig_cache = st.session_state.setdefault('_fig_cache', {})
+
+            if fig_key in fig_cache:
+                fig_conf, fig_severity = fig_cache[fig_key]
+            else:
+                fig_conf = render_confidence_chart(tuple(confidences))
+                severity_counts = get_severity_distribution(confidences)
+                fig_severity = render_severity_chart(tuple(severity_counts.items()))
+                if len(fig_cache) >= 32:
+                    fig_cache.clear()
+                fig_cache[fig_key] = (fig_conf, fig_severity)
+
             graph_col1, graph_col2 = st.columns(2)
-            
+
             with graph_col1:
                 # Confidence distribution chart
-                fig_conf = render_confidence_chart(confidences)
                 st.plotly_chart(fig_conf, use_container_width=True)
-            
+
             with graph_col2:
                 # Severity distribution chart
-                severity_counts = get_severity_distribution(confidences)
-                fig_severity = render_severity_chart(severity_counts)
                 st.plotly_chart(fig_severity, use_container_width=True)
             
             # Defect type distribution (if multiple types)
@@ -158,7 +170,7 @@ def main():
                 for name in class_names:
                     type_counts[name] = type_counts.get(name, 0) + 1
                 
-                fig_types = render_type_distribution_chart(type_counts)
+                fig_types = render_type_distribution_chart(tuple(type_counts.items()))
                 st.plotly_chart(fig_types, use_container_width=True)
             
             # Confidence statistics
@@ -174,10 +186,7 @@ def main():
                 st.metric("Lowest Confidence", f"{stats['min']:.1%}")
             with stat_col4:
                 st.metric("Std Deviation", f"{stats['std']:.1%}")
-        
-        # Cleanup temporary file
-        cleanup_temp_file(image_path)
-    
+
     # ========================================================================
     # DETECTION HISTORY & TRENDS
     # ========================================================================
@@ -3,16 +3,26 @@ Analytics and Statistics
 Handles confidence statistics and detection analytics
 """
 
+import math
+
 import numpy as np
 
+# Shared severity scale: code 0/1/2 = below/between/above the thresholds
+SEVERITY_THRESHOLDS = (0.4, 0.7)
+SEVERITY_LEVELS = ('Low', 'Medium', 'High')
+
 
 def calculate_confidence_stats(confidences):
     """
     Calculate statistical metrics for confidence scores
-    
+
+    Uses Welford's online algorithm so mean, min, max and std are all
+    computed in a single pass over the scores instead of four separate
+    NumPy reductions.
+
     Args:
         confidences (list): List of confidence scores
-        
+
     Returns:
         dict: Statistical metrics
     """
@@ -23,12 +33,28 @@ def calculate_confidence_stats(confidences):
             'min': 0,
             'std': 0
         }
-    
+
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    minimum = math.inf
+    maximum = -math.inf
+
+    for value in confidences:
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        m2 += delta * (value - mean)
+        if value < minimum:
+            minimum = value
+        if value > maximum:
+            maximum = value
+
     return {
-        'mean': np.mean(confidences),
-        'max': np.max(confidences),
-        'min': np.min(confidences),
-        'std': np.std(confidences)
+        'mean': mean,
+        'max': maximum,
+        'min': minimum,
+        'std': math.sqrt(m2 / n)
     }
 
 
@@ -42,29 +68,33 @@ def categorize_severity(confidence):
     Returns:
         str: Severity category (High, Medium, Low)
     """
-    if confidence > 0.7:
-        return 'High'
-    elif confidence > 0.4:
-        return 'Medium'
-    else:
-        return 'Low'
+    code = (confidence > SEVERITY_THRESHOLDS[0]) + (confidence > SEVERITY_THRESHOLDS[1])
+    return SEVERITY_LEVELS[code]
 
 
 def get_severity_distribution(confidences):
     """
     Get distribution of severity levels
-    
+
+    Maps each score to an integer severity code (0=Low, 1=Medium,
+    2=High) with two vectorized comparisons, then counts the codes with
+    a single np.bincount instead of per-element Python categorization.
+
     Args:
         confidences (list): List of confidence scores
-        
+
     Returns:
         dict: Count of each severity level
     """
-    severities = [categorize_severity(c) for c in confidences]
+    scores = np.asarray(confidences)
+    codes = (scores > SEVERITY_THRESHOLDS[0]).astype(np.int8) \
+        + (scores > SEVERITY_THRESHOLDS[1]).astype(np.int8)
+    counts = np.bincount(codes, minlength=3)
+
     return {
-        'High': severities.count('High'),
-        'Medium': severities.count('Medium'),
-        'Low': severities.count('Low')
+        'High': int(counts[2]),
+        'Medium': int(counts[1]),
+        'Low': int(counts[0])
     }
 
 
@@ -101,12 +131,21 @@ def get_historical_stats(detection_history):
             'scans_with_defects': 0,
             'total_scans': 0
         }
-    
-    detection_counts = [record['detections'] for record in detection_history]
-    
+
+    # Single pass: total, scan count and defect-scan count accumulate together
+    total = 0
+    scans_with_defects = 0
+    total_scans = 0
+
+    for record in detection_history:
+        count = record['detections']
+        total += count
+        scans_with_defects += count > 0
+        total_scans += 1
+
     return {
-        'total_detections': sum(detection_counts),
-        'average_per_scan': sum(detection_counts) / len(detection_counts),
-        'scans_with_defects': sum(1 for count in detection_counts if count > 0),
-        'total_scans': len(detection_counts)
+        'total_detections': total,
+        'average_per_scan': total / total_scans,
+        'scans_with_defects': scans_with_defects,
+        'total_scans': total_scans
     }
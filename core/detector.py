@@ -3,36 +3,50 @@ Detection Logic
 Handles YOLO prediction and result processing
 """
 
-import cv2
 import numpy as np
+import pandas as pd
+import torch
 from datetime import datetime
 
+from core.analytics import SEVERITY_THRESHOLDS
 
-def run_detection(model, image_path, confidence_threshold=0.25, iou_threshold=0.45, img_size=1024):
+# Display labels indexed by severity code (0=Low, 1=Medium, 2=High)
+_SEV_LABELS = ('🟢 Low', '🟡 Medium', '🔴 High')
+
+
+def run_detection(model, image, confidence_threshold=0.25, iou_threshold=0.45, img_size=1024):
     """
-    Run YOLO detection on an image
-    
+    Run YOLO detection on a decoded image
+
+    Takes the already-decoded RGB array so Ultralytics does not re-read
+    and re-decode the original file from disk; the caller can reuse the
+    same decode for display.
+
     Args:
         model: YOLO model instance
-        image_path (str): Path to the image file
+        image (numpy.ndarray): Decoded RGB image array
         confidence_threshold (float): Minimum confidence for detections
         iou_threshold (float): IOU threshold for NMS
         img_size (int): Image size for inference
-        
+
     Returns:
         tuple: (results, processed_image, detection_count)
     """
+    # Ultralytics treats ndarray sources as BGR (OpenCV convention)
+    bgr_image = np.ascontiguousarray(image[:, :, ::-1])
+
     results = model.predict(
-        source=image_path,
+        source=bgr_image,
         conf=confidence_threshold,
         iou=iou_threshold,
         imgsz=img_size,
+        half=torch.cuda.is_available(),
         save=False
     )
     
-    # Process results
-    result_img = results[0].plot()
-    result_img = cv2.cvtColor(result_img, cv2.COLOR_BGR2RGB)
+    # Process results: BGR -> RGB via a stride-reversed view, materialized
+    # once for st.image instead of a cv2.cvtColor allocation + copy
+    result_img = np.ascontiguousarray(results[0].plot()[:, :, ::-1])
     
     # Get detection count
     boxes = results[0].boxes
@@ -44,31 +58,35 @@ def run_detection(model, image_path, confidence_threshold=0.25, iou_threshold=0.
 def extract_detection_data(results, model):
     """
     Extract detailed detection data from YOLO results
-    
+
+    Pulls confidences and class ids off the result tensors in two bulk
+    GPU-to-CPU copies instead of indexing each box Python-side, and
+    assembles the table column-wise so each column keeps one dtype with
+    no per-cell inference. Confidence is the raw score; the table
+    renderer formats it client-side.
+
     Args:
         results: YOLO prediction results
         model: YOLO model instance
-        
+
     Returns:
-        list: List of detection dictionaries with details
+        pandas.DataFrame: One row per detection (ID, Type, Confidence, Severity)
     """
     boxes = results[0].boxes
-    detection_data = []
-    
-    for idx, box in enumerate(boxes):
-        conf = float(box.conf[0])
-        cls = int(box.cls[0])
-        class_name = model.names[cls]
-        
-        detection_data.append({
-            'ID': idx + 1,
-            'Type': class_name,
-            'Confidence': f"{conf:.2%}",
-            'Confidence_Raw': conf,
-            'Severity': '🔴 High' if conf > 0.7 else '🟡 Medium' if conf > 0.4 else '🟢 Low'
-        })
-    
-    return detection_data
+
+    confs = boxes.conf.detach().cpu().numpy().astype(np.float32)
+    clss = boxes.cls.detach().cpu().numpy().astype(np.int32)
+    sev_idx = (confs > SEVERITY_THRESHOLDS[0]).astype(np.int8) \
+        + (confs > SEVERITY_THRESHOLDS[1]).astype(np.int8)
+
+    class_names = np.array(list(model.names.values()), dtype=object)
+
+    return pd.DataFrame({
+        'ID': np.arange(1, len(confs) + 1, dtype=np.int32),
+        'Type': pd.Categorical(class_names[clss]),
+        'Confidence': confs,
+        'Severity': pd.Categorical(np.array(_SEV_LABELS, dtype=object)[sev_idx])
+    })
 
 
 def create_detection_record(num_detections, confidence_threshold):
@@ -5,6 +5,7 @@ Reusable UI components for the Streamlit app
 
 import streamlit as st
 from datetime import datetime
+from itertools import islice
 import plotly.graph_objects as go
 import numpy as np
 
@@ -94,21 +95,38 @@ def render_alert_box(num_detections, confidence_threshold):
 def render_detection_table(detection_data):
     """
     Render detection details table
-    
+
     Args:
-        detection_data (list): List of detection dictionaries
+        detection_data (pandas.DataFrame): One row per detection
     """
     st.markdown("### 📋 Detection Details")
-    st.dataframe(detection_data, use_container_width=True)
+    st.dataframe(
+        detection_data,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Confidence': st.column_config.ProgressColumn(
+                'Confidence',
+                min_value=0.0,
+                max_value=1.0,
+                format='percent'
+            )
+        }
+    )
 
 
+@st.cache_data(max_entries=64)
 def render_confidence_chart(confidences):
     """
     Render confidence distribution bar chart
-    
+
+    Cached on the confidence values so Streamlit reruns with unchanged
+    detections reuse the built figure instead of re-validating the
+    Plotly schema.
+
     Args:
-        confidences (list): List of confidence scores
-        
+        confidences (tuple): Confidence scores (hashable for caching)
+
     Returns:
         plotly.graph_objects.Figure: Confidence chart
     """
@@ -146,16 +164,18 @@ def render_confidence_chart(confidences):
     return fig
 
 
+@st.cache_data(max_entries=64)
 def render_severity_chart(severity_counts):
     """
     Render severity distribution pie chart
-    
+
     Args:
-        severity_counts (dict): Dictionary of severity counts
-        
+        severity_counts (tuple): (severity, count) pairs (hashable for caching)
+
     Returns:
         plotly.graph_objects.Figure: Severity pie chart
     """
+    severity_counts = dict(severity_counts)
     severity_colors = {'High': '#ef4444', 'Medium': '#f59e0b', 'Low': '#22c55e'}
     
     fig = go.Figure(data=[go.Pie(
@@ -188,16 +208,18 @@ def render_severity_chart(severity_counts):
     return fig
 
 
+@st.cache_data(max_entries=64)
 def render_type_distribution_chart(type_counts):
     """
     Render defect type distribution chart
-    
+
     Args:
-        type_counts (dict): Dictionary of defect type counts
-        
+        type_counts (tuple): (defect type, count) pairs (hashable for caching)
+
     Returns:
         plotly.graph_objects.Figure: Type distribution chart
     """
+    type_counts = dict(type_counts)
     fig = go.Figure(data=[go.Bar(
         x=list(type_counts.keys()),
         y=list(type_counts.values()),
@@ -295,11 +317,11 @@ def render_detection_history(detection_history):
     Render recent detection history
     
     Args:
-        detection_history (list): List of detection records
+        detection_history (deque): Detection records, newest first
     """
     st.markdown("### 📜 Recent Detection History")
-    
-    for record in detection_history[:5]:
+
+    for record in islice(detection_history, 5):
         status_class = "status-critical" if record['status'] == 'Critical' else "status-safe"
         st.markdown(f"""
         <div class="detection-box">
@@ -3,6 +3,8 @@ Sidebar Components
 Handles sidebar UI elements and controls
 """
 
+from collections import deque
+
 import streamlit as st
 
 
@@ -50,7 +52,8 @@ def initialize_session_state():
     Initialize Streamlit session state variables
     """
     if 'detection_history' not in st.session_state:
-        st.session_state.detection_history = []
+        # Bounded deque: appendleft is O(1) and old records fall off the end
+        st.session_state.detection_history = deque(maxlen=10)
     if 'total_scans' not in st.session_state:
         st.session_state.total_scans = 0
     if 'total_defects' not in st.session_state:
@@ -0,0 +1,33 @@
+# cython: language_level=3
+"""
+Compiled fast path for upload validation
+
+Optional extension mirroring the metadata checks in utils.file_utils;
+that module falls back to its pure-Python implementation when this has
+not been built. Build in place with:
+
+    cythonize -i utils/_file_utils_fast.pyx
+"""
+
+DEF MAX_SIZE_BYTES = 10485760  # keep in sync with file_utils._MAX_SIZE_BYTES
+
+
+cpdef int validate_meta(const unsigned char[:] header, Py_ssize_t size):
+    """Return 0 if valid, 1 for an unknown format, 2 for oversize."""
+    cdef Py_ssize_t n = header.shape[0]
+
+    # Cheapest rejection first: one integer compare before the sniff
+    if size > MAX_SIZE_BYTES:
+        return 2
+
+    if n >= 8 and header[0] == 0x89 and header[1] == 0x50 \
+            and header[2] == 0x4E and header[3] == 0x47 \
+            and header[4] == 0x0D and header[5] == 0x0A \
+            and header[6] == 0x1A and header[7] == 0x0A:
+        pass  # PNG signature
+    elif n >= 3 and header[0] == 0xFF and header[1] == 0xD8 and header[2] == 0xFF:
+        pass  # JPEG SOI marker
+    else:
+        return 1
+
+    return 0
@@ -3,79 +3,578 @@ File Utilities
 Helper functions for file handling and temporary file management
 """
 
+import atexit
+import hashlib
+import io
+import mmap
+import queue
 import tempfile
+import threading
 import os
-from PIL import Image
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
 
+import numpy as np
+import PIL
+from PIL import Image, features
 
-def save_temp_file(uploaded_file, suffix=".jpg"):
+# JPEG decode speed hinges on the library Pillow is linked against:
+# libjpeg-turbo (stock wheels) or Pillow-SIMD use SSE/AVX2 IDCT kernels,
+# generic libjpeg builds are 2-4x slower on the decode path
+try:
+    _LIBJPEG_TURBO = features.check_feature('libjpeg_turbo')
+except Exception:
+    _LIBJPEG_TURBO = False
+
+# Pool of reusable temp files: cleanup_temp_file returns entries here and
+# save_temp_file truncates and rewrites them, so repeat uploads in a
+# session pay ftruncate+write instead of inode creation and unlink
+_TMP_POOL = queue.LifoQueue()
+
+# Files currently handed out to callers, keyed by path
+_TMP_IN_USE = {}
+
+
+def _drain_temp_pool():
+    """Close and unlink all pooled temp files at interpreter exit"""
+    while True:
+        try:
+            fd, path = _TMP_POOL.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            os.close(fd)
+            os.unlink(path)
+        except OSError:
+            pass
+
+    for path, fd in _TMP_IN_USE.items():
+        try:
+            os.close(fd)
+            os.unlink(path)
+        except OSError:
+            pass
+    _TMP_IN_USE.clear()
+
+
+atexit.register(_drain_temp_pool)
+
+# Non-pooled deletions are queued and handled by a daemon thread so the
+# request path never waits on filesystem metadata I/O
+_DELETE_QUEUE = queue.SimpleQueue()
+
+
+def _delete_worker():
+    """Unlink queued temp files in the background"""
+    while True:
+        path = _DELETE_QUEUE.get()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing temporary file: {e}")
+
+
+def _drain_delete_queue():
+    """Remove any still-queued files synchronously at interpreter exit"""
+    while True:
+        try:
+            path = _DELETE_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+threading.Thread(target=_delete_worker, daemon=True).start()
+atexit.register(_drain_delete_queue)
+
+
+@dataclass(frozen=True, slots=True)
+class FileMeta:
+    """
+    Upload metadata snapshot computed once per file
+
+    UploadedFile exposes name and size through property descriptors, so
+    touching them repeatedly across validate/save/cleanup is not free;
+    this pays for the lookups and the extension parse a single time.
+    """
+    name: str
+    ext: str
+    size: int
+    fileobj: Any
+
+    @classmethod
+    def from_upload(cls, uploaded_file):
+        """Build a FileMeta from a Streamlit UploadedFile"""
+        name = uploaded_file.name
+        return cls(
+            name=name,
+            ext=os.path.splitext(name)[1][1:].lower(),
+            size=uploaded_file.size,
+            fileobj=uploaded_file
+        )
+
+
+def _kernel_copy(uploaded_file, dest_fd):
+    """
+    Copy a disk-backed upload with os.copy_file_range
+
+    Large uploads spill out of Streamlit's memory buffer into a real
+    file; for those the bytes can be moved entirely inside the kernel —
+    no user-space chunk buffer, and the GIL is released for the
+    duration of each copy.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+        dest_fd (int): Destination file descriptor
+
+    Returns:
+        bool: True if the copy completed; False if the upload is
+            memory-backed or the kernel refused, with nothing written
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+
+    try:
+        src_fd = uploaded_file.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+    try:
+        while os.copy_file_range(src_fd, dest_fd, 1 << 24) > 0:
+            pass
+        return True
+    except OSError:
+        # e.g. cross-filesystem on older kernels; undo any partial copy
+        # and let the chunked path redo it from the start
+        os.ftruncate(dest_fd, 0)
+        os.lseek(dest_fd, 0, os.SEEK_SET)
+        uploaded_file.seek(0)
+        return False
+
+
+def save_temp_file(uploaded_file, suffix=".jpg", with_digest=False, meta=None):
     """
     Save uploaded file to temporary location
-    
+
+    Disk-backed uploads are copied inside the kernel via
+    copy_file_range; everything else streams in 1 MiB chunks so peak
+    memory stays constant. Either way the bytes land in a pooled temp
+    file that repeat uploads reuse instead of creating and unlinking a
+    fresh one each time.
+
     Args:
         uploaded_file: Streamlit UploadedFile object
-        suffix (str): File extension suffix
-        
+        suffix (str): File extension suffix (used only for new pool entries)
+        with_digest (bool): Also return a blake2b hex digest of the
+            contents, updated inside the copy loop while each chunk is
+            still hot in cache — no second pass over the bytes
+        meta (FileMeta): Optional precomputed metadata; its extension
+            overrides the suffix for new pool entries
+
     Returns:
-        str: Path to temporary file
+        str: Path to temporary file, or (path, digest) when
+            with_digest is True
     """
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(uploaded_file.read())
-        return tmp.name
+    if meta is not None and meta.ext:
+        suffix = '.' + meta.ext
+
+    # Rewind first: a rerun (or an earlier validation read) may have
+    # left the upload buffer at EOF
+    uploaded_file.seek(0)
+
+    try:
+        fd, path = _TMP_POOL.get_nowait()
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+    except queue.Empty:
+        fd, path = tempfile.mkstemp(suffix=suffix)
+
+    # Hashing needs the bytes in user space, so the kernel-side copy
+    # only applies to plain saves
+    if with_digest or not _kernel_copy(uploaded_file, fd):
+        hasher = hashlib.blake2b(digest_size=16) if with_digest else None
+        while True:
+            chunk = uploaded_file.read(1024 * 1024)
+            if not chunk:
+                break
+            if hasher is not None:
+                hasher.update(chunk)
+            os.write(fd, chunk)
+
+    _TMP_IN_USE[path] = fd
+
+    if with_digest:
+        return path, hasher.hexdigest()
+    return path
 
 
 def cleanup_temp_file(file_path):
     """
-    Remove temporary file
-    
+    Release a temporary file
+
+    Pool-managed files are truncated and returned for reuse rather than
+    unlinked; anything else is handed to the background deleter, so the
+    caller returns immediately either way.
+
     Args:
-        file_path (str): Path to file to remove
+        file_path (str): Path to file to release
     """
-    try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except Exception as e:
-        print(f"Error removing temporary file: {e}")
+    fd = _TMP_IN_USE.pop(file_path, None)
+    if fd is not None:
+        _TMP_POOL.put((fd, file_path))
+        return
+
+    _DELETE_QUEUE.put(file_path)
+
+
+# Decoded-pixel cache: (path, mtime_ns, size, target) -> ndarray.
+# A hit on a Streamlit rerun skips the libjpeg/libpng decode entirely;
+# the mtime/size in the key invalidates stale entries automatically.
+_DECODE_CACHE = OrderedDict()
+_DECODE_CACHE_MAX = 32
+_DECODE_CACHE_LOCK = threading.Lock()
+
+
+def _make_loader(apply_draft):
+    """
+    Build a loader closure with the per-format decode policy pre-bound
+
+    The open calls and the draft decision are bound into the closure at
+    import time, so the per-call path carries no format branching.
+
+    Args:
+        apply_draft (bool): Honor the target size hint via JPEG draft mode
+
+    Returns:
+        callable: Loader taking (image_path, target)
+    """
+    mmap_open = mmap.mmap
+    image_open = Image.open
+
+    def _load(image_path, target):
+        try:
+            with open(image_path, 'rb') as f:
+                # The mapping stays valid after the file object is closed
+                mapped = mmap_open(f.fileno(), 0, access=mmap.ACCESS_READ)
+            img = image_open(mapped)
+        except (OSError, ValueError):
+            # Empty files cannot be mapped; fall back to a plain open
+            img = image_open(image_path)
+
+        if apply_draft and target is not None and img.format == 'JPEG':
+            # libjpeg decodes at 1/2, 1/4 or 1/8 scale essentially for free
+            img.draft('RGB', target)
+            img.load()
+
+        return img
+
+    return _load
 
 
-def load_image(image_path):
+# Per-extension loaders specialized once at import. Unknown extensions
+# (including generic pooled temp names) use the draft-capable loader,
+# whose format check still guards against mislabeled content.
+_LOADERS = {
+    'jpg': _make_loader(apply_draft=True),
+    'jpeg': _make_loader(apply_draft=True),
+    'png': _make_loader(apply_draft=False)
+}
+_DEFAULT_LOADER = _make_loader(apply_draft=True)
+
+
+def load_image(image_path, target=None):
     """
     Load image from file path
-    
+
+    Decoded pixels are cached against the file's path, mtime and size,
+    so re-loading an unchanged file (the common case across Streamlit
+    reruns) skips the decode. On a miss the file is memory-mapped and
+    handed to PIL, so the decode is served straight from the page cache
+    without a second user-space copy of bytes that save_temp_file just
+    wrote.
+
     Args:
         image_path (str): Path to image file
-        
+        target (tuple): Optional (width, height) size hint; JPEGs are
+            decoded at the nearest DCT-scaled resolution, cutting IDCT
+            work by 4-16x when the full size is not needed
+
     Returns:
         PIL.Image: Loaded image
     """
-    return Image.open(image_path)
+    file_stat = os.stat(image_path)
+    cache_key = (image_path, file_stat.st_mtime_ns, file_stat.st_size, target)
+
+    with _DECODE_CACHE_LOCK:
+        cached = _DECODE_CACHE.get(cache_key)
+        if cached is not None:
+            _DECODE_CACHE.move_to_end(cache_key)
 
+    if cached is not None:
+        hit = Image.fromarray(cached)
+        hit._pixel_array = cached
+        return hit
 
-def validate_image_file(uploaded_file):
+    extension = os.path.splitext(image_path)[1][1:].lower()
+    img = _LOADERS.get(extension, _DEFAULT_LOADER)(image_path, target)
+
+    # Only modes that round-trip through Image.fromarray are cached
+    if img.mode in ('L', 'RGB', 'RGBA'):
+        pixels = np.asarray(img)
+        img._pixel_array = pixels
+        with _DECODE_CACHE_LOCK:
+            _DECODE_CACHE[cache_key] = pixels
+            while len(_DECODE_CACHE) > _DECODE_CACHE_MAX:
+                _DECODE_CACHE.popitem(last=False)
+
+    return img
+
+
+def decoder_info():
+    """
+    Report which JPEG decoder this Pillow build is linked against
+
+    Useful in deployment diagnostics to catch an accidental
+    generic-libjpeg build where decodes run 2-4x slower.
+
+    Returns:
+        dict: Pillow version and whether libjpeg-turbo is linked
+    """
+    return {
+        'pillow_version': PIL.__version__,
+        'libjpeg_turbo': _LIBJPEG_TURBO
+    }
+
+
+def image_to_array(image):
+    """
+    Convert a PIL image to a NumPy array without re-copying
+
+    np.asarray copies the pixel buffer on every call; the array is
+    memoized on the image object instead, so display and inference in
+    the same rerun share one conversion. Images served from the decode
+    cache carry their array already and convert for free.
+
+    Args:
+        image (PIL.Image): Loaded image
+
+    Returns:
+        numpy.ndarray: Pixel array
+    """
+    pixels = getattr(image, '_pixel_array', None)
+    if pixels is None:
+        pixels = np.asarray(image)
+        image._pixel_array = pixels
+    return pixels
+
+
+def load_image_pinned(image_path, target=None):
+    """
+    Load an image into page-locked host memory for GPU inference
+
+    PyTorch stages pageable arrays through an internal pinned buffer
+    before every host-to-device copy; handing it a tensor that is
+    already pinned skips that staging copy and allows async transfer.
+    Requires torch with CUDA — CPU-only callers should use load_image.
+
+    Args:
+        image_path (str): Path to image file
+        target (tuple): Optional (width, height) size hint (see load_image)
+
+    Returns:
+        torch.Tensor: HWC uint8 tensor in pinned host memory
+    """
+    import torch
+
+    pixels = image_to_array(load_image(image_path, target=target))
+    pinned = torch.empty(pixels.shape, dtype=torch.uint8, pin_memory=True)
+    pinned.numpy()[...] = pixels
+    return pinned
+
+
+def load_image_from_upload(uploaded_file):
+    """
+    Load image directly from an uploaded file's in-memory buffer
+
+    UploadedFile is already a BytesIO subclass, so PIL can decode it
+    in place — no temp-file write/read round trip.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+
+    Returns:
+        PIL.Image: Loaded image
+    """
+    uploaded_file.seek(0)
+    return Image.open(uploaded_file)
+
+
+# Validation constants, built once at import instead of per call
+_VALID_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png'})
+_EXTENSION_ERROR = "Invalid file type. Supported: jpg, jpeg, png"
+_MAX_SIZE_BYTES = 10 * 1024 * 1024
+_SIZE_ERROR = "File too large. Maximum size: 10MB"
+
+# Magic-byte signatures matched against the file's leading bytes
+_PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+_JPEG_MAGIC = b'\xff\xd8\xff'
+
+
+def _sniff_image_format(header):
+    """
+    Identify the image format from a file's first bytes
+
+    Args:
+        header (bytes): At least the first 8 bytes of the file
+
+    Returns:
+        str: 'png' or 'jpg', or None if neither signature matches
+    """
+    if header[:8] == _PNG_MAGIC:
+        return 'png'
+    if header[:3] == _JPEG_MAGIC:
+        return 'jpg'
+    return None
+
+
+def _validate_meta(header, size):
+    """
+    Validate a file's magic bytes and size
+
+    Pure-Python twin of the optional compiled validator below.
+
+    Args:
+        header (bytes): At least the first 8 bytes of the file
+        size (int): File size in bytes
+
+    Returns:
+        int: 0 if valid, 1 for an unknown format, 2 for oversize
+    """
+    # Cheapest rejection first: one integer compare before the sniff
+    if size > _MAX_SIZE_BYTES:
+        return 2
+    if _sniff_image_format(header) is None:
+        return 1
+    return 0
+
+
+# Prefer the Cython build of the validator when it has been compiled
+# (cythonize -i utils/_file_utils_fast.pyx); the per-call win only
+# matters for large multi-file batches
+try:
+    from utils._file_utils_fast import validate_meta as _validate_meta  # noqa: F811
+except ImportError:
+    pass
+
+
+def validate_image_file(uploaded_file, meta=None):
     """
     Validate uploaded image file
-    
+
+    The format check reads the file's magic bytes rather than trusting
+    the client-supplied filename extension.
+
     Args:
         uploaded_file: Streamlit UploadedFile object
-        
+        meta (FileMeta): Optional precomputed metadata
+
     Returns:
         tuple: (is_valid, error_message)
     """
     if uploaded_file is None:
         return False, "No file uploaded"
-    
-    # Check file extension
-    valid_extensions = ['jpg', 'jpeg', 'png']
-    file_extension = uploaded_file.name.split('.')[-1].lower()
-    
-    if file_extension not in valid_extensions:
-        return False, f"Invalid file type. Supported: {', '.join(valid_extensions)}"
-    
-    # Check file size (max 10MB)
-    max_size_mb = 10
-    file_size_mb = uploaded_file.size / (1024 * 1024)
-    
-    if file_size_mb > max_size_mb:
-        return False, f"File too large. Maximum size: {max_size_mb}MB"
-    
+
+    # Reject oversize files on the size attribute alone, before paying
+    # for the header read
+    size = meta.size if meta is not None else uploaded_file.size
+    if size > _MAX_SIZE_BYTES:
+        return False, _SIZE_ERROR
+
+    # Check content signature — the filename extension can lie
+    uploaded_file.seek(0)
+    header = uploaded_file.read(8)
+    uploaded_file.seek(0)
+
+    code = _validate_meta(header, size)
+    if code == 1:
+        return False, _EXTENSION_ERROR
+    if code == 2:
+        return False, _SIZE_ERROR
+
     return True, ""
+
+
+def ingest_upload(uploaded_file):
+    """
+    Validate, save and decode an upload in one streaming pass
+
+    Fuses the steps callers otherwise run separately, each re-reading
+    the bytes: the magic bytes are sniffed from the head of the stream,
+    the content digest accumulates inside the same chunk loop that
+    writes the pooled temp file, and the decode is then served from the
+    pages (and decode cache) the write just populated.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+
+    Returns:
+        tuple: (path, image, digest, meta)
+
+    Raises:
+        ValueError: If the upload fails validation
+    """
+    meta = FileMeta.from_upload(uploaded_file)
+
+    uploaded_file.seek(0)
+    header = uploaded_file.read(8)
+
+    code = _validate_meta(header, meta.size)
+    if code == 1:
+        raise ValueError(_EXTENSION_ERROR)
+    if code == 2:
+        raise ValueError(_SIZE_ERROR)
+
+    path, digest = save_temp_file(uploaded_file, with_digest=True, meta=meta)
+    image = load_image(path)
+
+    return path, image, digest, meta
+
+
+def validate_image_files(uploaded_files):
+    """
+    Validate a batch of uploaded image files in one vectorized pass
+
+    For multi-file uploads the sizes and extensions are checked with
+    two NumPy comparisons over the whole batch instead of one Python-
+    level validation call per file.
+
+    Args:
+        uploaded_files (list): Streamlit UploadedFile objects
+
+    Returns:
+        tuple: (valid_mask, errors) — boolean ndarray plus a list with
+            an error message (or None) per file
+    """
+    count = len(uploaded_files)
+    if count == 0:
+        return np.zeros(0, dtype=bool), []
+
+    sizes = np.fromiter((f.size for f in uploaded_files), dtype=np.int64, count=count)
+    extensions = np.array([os.path.splitext(f.name)[1][1:].lower() for f in uploaded_files])
+
+    too_big = sizes > _MAX_SIZE_BYTES
+    bad_extension = ~np.isin(extensions, list(_VALID_EXTENSIONS))
+    valid_mask = ~(too_big | bad_extension)
+
+    errors = [
+        None if ok else (_EXTENSION_ERROR if bad else _SIZE_ERROR)
+        for ok, bad in zip(valid_mask, bad_extension)
+    ]
+
+    return valid_mask, errors